@@ -10,11 +10,24 @@ This agent system helps CS students prepare for technical interviews by:
 
 import os
 import json
+import asyncio
+import itertools
+import time
+import array
+import weakref
 import logging
+import importlib.util
+from collections import OrderedDict, deque
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, List, Any, AsyncIterator, NamedTuple, Optional, Tuple, Union
+import httpx
+import numpy as np
+try:
+    import orjson
+except ImportError:  # optional: faster JSON serialization
+    orjson = None
 from google import genai
-from google.genai.types import Tool, FunctionDeclaration
+from google.genai.types import Tool, FunctionDeclaration, HttpOptions
 
 # Configure logging for observability
 logging.basicConfig(
@@ -23,47 +36,278 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Attempts kept in detail; lifetime totals live in running counters
+RECENT_ATTEMPTS = 1000
+
+# HTTP transport: pooled keep-alive connections, multiplexed over HTTP/2 when h2 is installed
+HTTP_TIMEOUT_MS = 60_000
+HTTP_MAX_CONNECTIONS = 32
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 16
+
+def _http_options() -> HttpOptions:
+    """Build Gemini client transport options for concurrent async requests"""
+    http2 = importlib.util.find_spec('h2') is not None
+    if not http2:
+        logger.info("h2 not installed, Gemini async client will use HTTP/1.1")
+    
+    # Hand google-genai a constructed httpx client rather than async_client_args: with aiohttp
+    # installed it may otherwise pick its aiohttp transport and silently drop these settings
+    async_client = httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS
+        ),
+        http2=http2
+    )
+    return HttpOptions(timeout=HTTP_TIMEOUT_MS, httpx_async_client=async_client)
+
+HTTP_OPTIONS = _http_options()
+
+# Wall-clock readings are reused this long, so bursts of timestamps share one formatting
+CLOCK_CACHE_SECONDS = 0.001
+
+# (monotonic reading, wall-clock datetime, its isoformat) from the last _cached_now call
+_clock_cache: Optional[Tuple[float, datetime, str]] = None
+
+def _cached_now() -> Tuple[datetime, str]:
+    """Return the current time and its ISO string, reusing a reading under a millisecond old"""
+    global _clock_cache
+    tick = time.monotonic()
+    cached = _clock_cache
+    if cached is not None and tick - cached[0] < CLOCK_CACHE_SECONDS:
+        return cached[1], cached[2]
+    
+    now = datetime.now()
+    _clock_cache = (tick, now, now.isoformat())
+    return _clock_cache[1], _clock_cache[2]
+
+def _iso_now() -> str:
+    """Current wall-clock time as an ISO string, via the cached clock"""
+    return _cached_now()[1]
+
 # Initialize Gemini client
-client = genai.Client(api_key=os.getenv('GEMINI_API_KEY'))
+client = genai.Client(api_key=os.getenv('GEMINI_API_KEY'), http_options=HTTP_OPTIONS)
+
+def _shared_client(api_key: Optional[str] = None) -> genai.Client:
+    """Reuse the module-level client unless a different API key is requested"""
+    if api_key is None or api_key == os.getenv('GEMINI_API_KEY'):
+        return client
+    return genai.Client(api_key=api_key, http_options=HTTP_OPTIONS)
+
+# Topics the tracker recommends from, in default study order
+ALL_TOPICS = ['Arrays', 'Linked Lists', 'Trees', 'Graphs', 'Dynamic Programming',
+              'Backtracking', 'Greedy', 'Sorting', 'Searching', 'Strings']
+
+# Generated problem cache: repeat (topic, difficulty, user_level) requests reuse content
+PROBLEM_CACHE_TTL_SECONDS = 3600
+PROBLEM_CACHE_MAX_ENTRIES = 256
+
+# Semantic cache: requests for free-text topics outside ALL_TOPICS reuse content generated for a
+# near-duplicate topic at the same difficulty and user level, via embedding similarity of the topic
+# text. Entries expire after PROBLEM_CACHE_TTL_SECONDS, like the exact cache
+EMBEDDING_MODEL = 'text-embedding-004'
+SEMANTIC_CACHE_THRESHOLD = 0.92
+SEMANTIC_CACHE_MAX_ENTRIES = 1024
+
+# Gemini explicit context caching for static system prompts. Gemini refuses caches
+# below a minimum token count, so shorter prompts are sent inline instead; once the
+# cache's TTL has passed the prompt is sent inline again.
+CONTEXT_CACHE_TTL_SECONDS = 3600
+CONTEXT_CACHE_MIN_TOKENS = 2048
+CHARS_PER_TOKEN_ESTIMATE = 4
+
+PROBLEM_SYSTEM_PROMPT = """You are an expert DSA problem creator for technical interviews.
+
+For each requested problem, provide:
+1. Problem Title
+2. Problem Description (clear and concise)
+3. Input Format
+4. Output Format
+5. Constraints
+6. Sample Test Cases (2-3 examples with explanations)
+7. Hints (2-3 hints without giving away the solution)
+
+Format the response as JSON with keys: title, description, input_format, output_format, constraints, test_cases, hints
+"""
+
+EVALUATOR_SYSTEM_PROMPT = """You are an expert code reviewer for technical interviews.
+
+Evaluate each submitted solution against its problem and provide:
+1. Correctness (Does it solve the problem?)
+2. Time Complexity
+3. Space Complexity
+4. Code Quality (readability, style)
+5. Edge Cases Handled
+6. Suggestions for Improvement
+7. Overall Score (0-100)
+
+Format as JSON with keys: correctness, time_complexity, space_complexity, code_quality, edge_cases, suggestions, score
+"""
+
+# Gemini structured output schemas: responses arrive as validated JSON and are parsed once
+PROBLEM_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'title': {'type': 'string'},
+        'description': {'type': 'string'},
+        'input_format': {'type': 'string'},
+        'output_format': {'type': 'string'},
+        'constraints': {'type': 'string'},
+        'test_cases': {
+            'type': 'array',
+            'items': {
+                'type': 'object',
+                'properties': {
+                    'input': {'type': 'string'},
+                    'output': {'type': 'string'},
+                    'explanation': {'type': 'string'}
+                },
+                'required': ['input', 'output']
+            }
+        },
+        'hints': {'type': 'array', 'items': {'type': 'string'}}
+    },
+    'required': ['title', 'description', 'input_format', 'output_format', 'constraints', 'test_cases', 'hints']
+}
+
+EVALUATION_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'correctness': {'type': 'string'},
+        'time_complexity': {'type': 'string'},
+        'space_complexity': {'type': 'string'},
+        'code_quality': {'type': 'string'},
+        'edge_cases': {'type': 'string'},
+        'suggestions': {'type': 'array', 'items': {'type': 'string'}},
+        'score': {'type': 'integer'}
+    },
+    'required': ['correctness', 'time_complexity', 'space_complexity', 'code_quality', 'edge_cases', 'suggestions', 'score']
+}
+
+# Per-request prompt fragments; the static instructions travel as the system prompt
+PROBLEM_PROMPT_TMPL = "Create a {difficulty} level {topic} problem suitable for a {user_level} programmer preparing for technical interviews."
+
+EVALUATION_PROMPT_TMPL = """Problem:
+{problem}
+
+Submitted Solution ({language}):
+```{language}
+{solution_code}
+```
+"""
+
+def _format_problem_prompt(topic: str, difficulty: str, user_level: str) -> str:
+    """Fill the problem request template"""
+    return PROBLEM_PROMPT_TMPL.format_map({'topic': topic, 'difficulty': difficulty, 'user_level': user_level})
+
+DIFFICULTIES = ('Easy', 'Medium', 'Hard')
+USER_LEVELS = ('beginner', 'intermediate', 'advanced')
+
+# Every standard (topic, difficulty, user_level) prompt, rendered once at import
+PROBLEM_PROMPTS = {
+    (t, d, u): _format_problem_prompt(t, d, u)
+    for t in ALL_TOPICS for d in DIFFICULTIES for u in USER_LEVELS
+}
+
+def _render_problem_prompt(topic: str, difficulty: str, user_level: str) -> str:
+    """Look up the pre-rendered problem prompt, formatting only non-standard requests"""
+    prompt = PROBLEM_PROMPTS.get((topic, difficulty, user_level))
+    if prompt is None:
+        prompt = _format_problem_prompt(topic, difficulty, user_level)
+    return prompt
+
+# Upper bound on in-flight Gemini requests, shared by every sub-agent call
+GEMINI_MAX_CONCURRENCY = int(os.getenv('GEMINI_MAX_CONCURRENCY', '8'))
+if GEMINI_MAX_CONCURRENCY < 1:
+    # A zero-slot semaphore would make every async Gemini call wait forever
+    raise ValueError(f"GEMINI_MAX_CONCURRENCY must be at least 1, got {GEMINI_MAX_CONCURRENCY}")
+
+# Created lazily inside the running loop, since asyncio primitives bind to the loop that first
+# uses them. Weak keys drop a finished loop's limiter with it. This does not make the async API
+# multi-loop: the shared client's async httpx pool stays bound to the first loop that uses it
+_gemini_semaphores: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]' = weakref.WeakKeyDictionary()
+
+def _gemini_semaphore() -> asyncio.Semaphore:
+    """Return the Gemini request limiter for the running event loop"""
+    loop = asyncio.get_running_loop()
+    semaphore = _gemini_semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _gemini_semaphores[loop] = asyncio.Semaphore(GEMINI_MAX_CONCURRENCY)
+    return semaphore
+
+class Attempt(NamedTuple):
+    """A single problem attempt in the user's history"""
+    id: str
+    topic: str
+    difficulty: str
+    solved: bool
+    timestamp: str
 
 class ProgressTracker:
     """Manages user progress, session state, and memory"""
     
     def __init__(self):
         self.user_data = {
-            'problems_solved': [],
+            'problems_solved': deque(maxlen=RECENT_ATTEMPTS),
             'topics_covered': set(),
-            'weak_areas': [],
+            'weak_areas': {},  # ordered set: dict keys keep first-failed order with O(1) membership
             'streak_days': 0,
             'total_problems': 0,
+            'solved_count': 0,
             'last_session': None
         }
+        
+        # Columnar mirror of recent attempts for vectorized statistics, compacted as it grows
+        self._topic_names: List[str] = list(ALL_TOPICS)
+        self._topic_index: Dict[str, int] = {t: i for i, t in enumerate(self._topic_names)}
+        self._topic_ids = array.array('H')
+        self._solved_bitmap = bytearray()
+        
+        # Memoized recommend_next_topic result, cleared whenever progress changes
+        self._rec_cache: Optional[str] = None
+        
         logger.info("ProgressTracker initialized")
     
+    def _topic_id(self, topic: str) -> int:
+        """Return the column id for topic, registering topics outside ALL_TOPICS"""
+        topic_id = self._topic_index.get(topic)
+        if topic_id is None:
+            topic_id = self._topic_index[topic] = len(self._topic_names)
+            self._topic_names.append(topic)
+        return topic_id
+    
     def update_progress(self, problem_id: str, topic: str, difficulty: str, solved: bool):
         """Update user's progress after attempting a problem"""
         logger.info(f"Updating progress: {topic} - {difficulty} - Solved: {solved}")
         
-        self.user_data['problems_solved'].append({
-            'id': problem_id,
-            'topic': topic,
-            'difficulty': difficulty,
-            'solved': solved,
-            'timestamp': datetime.now().isoformat()
-        })
+        self._rec_cache = None
+        self.user_data['problems_solved'].append(Attempt(
+            id=problem_id,
+            topic=topic,
+            difficulty=difficulty,
+            solved=solved,
+            timestamp=_iso_now()
+        ))
+        self._topic_ids.append(self._topic_id(topic))
+        self._solved_bitmap.append(solved)
+        if len(self._solved_bitmap) >= 2 * RECENT_ATTEMPTS:
+            # Amortized compaction back to the window problems_solved keeps
+            del self._topic_ids[:-RECENT_ATTEMPTS]
+            del self._solved_bitmap[:-RECENT_ATTEMPTS]
         
         self.user_data['topics_covered'].add(topic)
         self.user_data['total_problems'] += 1
+        if solved:
+            self.user_data['solved_count'] += 1
         
         if not solved:
-            if topic not in self.user_data['weak_areas']:
-                self.user_data['weak_areas'].append(topic)
+            self.user_data['weak_areas'].setdefault(topic)
         
         return self.get_progress_summary()
     
     def get_progress_summary(self) -> Dict:
         """Get current progress summary"""
-        solved_count = sum(1 for p in self.user_data['problems_solved'] if p['solved'])
+        solved_count = self.user_data['solved_count']
         accuracy = (solved_count / self.user_data['total_problems'] * 100) if self.user_data['total_problems'] > 0 else 0
         
         return {
@@ -71,141 +315,539 @@ class ProgressTracker:
             'problems_solved': solved_count,
             'accuracy': round(accuracy, 2),
             'topics_covered': list(self.user_data['topics_covered']),
-            'weak_areas': self.user_data['weak_areas']
+            'weak_areas': list(self.user_data['weak_areas'])
+        }
+    
+    def topic_accuracy(self) -> Dict[str, float]:
+        """Accuracy percentage per topic over the last RECENT_ATTEMPTS attempts"""
+        # The columns hold up to 2 * RECENT_ATTEMPTS between compactions; count the same
+        # window problems_solved keeps
+        topic_ids = np.frombuffer(self._topic_ids, dtype=np.uint16)[-RECENT_ATTEMPTS:]
+        solved = np.frombuffer(self._solved_bitmap, dtype=np.uint8)[-RECENT_ATTEMPTS:]
+        attempts = np.bincount(topic_ids, minlength=len(self._topic_names))
+        solves = np.bincount(topic_ids, weights=solved, minlength=len(self._topic_names))
+        
+        accuracy = solves / np.maximum(attempts, 1) * 100
+        return {
+            self._topic_names[i]: round(float(accuracy[i]), 2)
+            for i in np.flatnonzero(attempts)
         }
     
     def recommend_next_topic(self) -> str:
         """Recommend next topic based on weak areas and coverage"""
-        all_topics = ['Arrays', 'Linked Lists', 'Trees', 'Graphs', 'Dynamic Programming', 
-                     'Backtracking', 'Greedy', 'Sorting', 'Searching', 'Strings']
+        if self._rec_cache is not None:
+            return self._rec_cache
         
         # Prioritize weak areas
         if self.user_data['weak_areas']:
-            return self.user_data['weak_areas'][0]
+            topic = next(iter(self.user_data['weak_areas']))
+        else:
+            # Return the first uncovered topic in study order
+            covered = self.user_data['topics_covered']
+            topic = next((t for t in ALL_TOPICS if t not in covered), ALL_TOPICS[0])
+        
+        self._rec_cache = topic
+        return topic
+    
+    def recommend_next_topics(self, k: int) -> List[str]:
+        """Recommend up to k distinct topics in priority order: weak areas, then uncovered, then the rest"""
+        covered = self.user_data['topics_covered']
+        uncovered = [t for t in ALL_TOPICS if t not in covered]
+        ranked = list(dict.fromkeys([*self.user_data['weak_areas'], *uncovered, *ALL_TOPICS]))
         
-        # Return uncovered topics
-        uncovered = [t for t in all_topics if t not in self.user_data['topics_covered']]
-        return uncovered[0] if uncovered else all_topics[0]
+        # Never repeat a topic: a repeat would hit the problem cache and return a duplicate problem
+        return ranked[:k]
 
-class ProblemGeneratorAgent:
-    """Agent responsible for generating custom DSA problems"""
+class SemanticCache:
+    """In-process cache that returns stored responses for similar embeddings under the same key"""
+    
+    def __init__(self, threshold: float = SEMANTIC_CACHE_THRESHOLD, max_entries: int = SEMANTIC_CACHE_MAX_ENTRIES,
+                 ttl_seconds: float = PROBLEM_CACHE_TTL_SECONDS):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._vectors: Optional[np.ndarray] = None  # unit-normalized rows, allocated on first add
+        self._responses: List[Any] = []
+        # Per row: exact-match key, the embedded text and its monotonic insertion time
+        self._rows: List[Tuple[Any, str, float]] = []
+        self._inserted = 0
+    
+    def lookup(self, vector: np.ndarray, key: Any, text: str) -> Optional[Any]:
+        """Return the live response under key most similar to vector, if above the threshold
+        
+        Rows for the same text are skipped: identical requests are the exact cache's job.
+        """
+        if not self._responses or vector.shape[0] != self._vectors.shape[1]:
+            return None
+        
+        now = time.monotonic()
+        candidates = [
+            i for i, (k, t, cached_at) in enumerate(self._rows)
+            if k == key and t != text and now - cached_at <= self.ttl_seconds
+        ]
+        if not candidates:
+            return None
+        
+        similarities = self._vectors[candidates] @ (vector / np.linalg.norm(vector))
+        best = int(np.argmax(similarities))
+        if similarities[best] >= self.threshold:
+            logger.info(f"Semantic cache hit (similarity {similarities[best]:.3f})")
+            return self._responses[candidates[best]]
+        return None
+    
+    def add(self, vector: np.ndarray, key: Any, text: str, response: Any):
+        """Store the response for text under key, overwriting the oldest entry once the cache is full"""
+        if self._vectors is None:
+            self._vectors = np.zeros((self.max_entries, vector.shape[0]), dtype=np.float32)
+        elif vector.shape[0] != self._vectors.shape[1]:
+            return
+        
+        slot = self._inserted % self.max_entries
+        self._vectors[slot] = vector / np.linalg.norm(vector)
+        row = (key, text, time.monotonic())
+        if slot < len(self._responses):
+            self._responses[slot] = response
+            self._rows[slot] = row
+        else:
+            self._responses.append(response)
+            self._rows.append(row)
+        self._inserted += 1
+
+class GeminiAgent:
+    """Base for sub-agents that call Gemini with a static system prompt"""
+    
+    system_prompt = ''
+    response_schema: Optional[Dict] = None
     
     def __init__(self, client):
         self.client = client
         self.model = 'gemini-2.0-flash-exp'
+        # Monotonic time after which Gemini has dropped the cached system prompt
+        self._cache_expires_at = 0.0
+        self.cached_content = self._create_context_cache()
+    
+    def _create_context_cache(self) -> Optional[str]:
+        """Upload the system prompt as Gemini cached content and return its name"""
+        estimated_tokens = len(self.system_prompt) // CHARS_PER_TOKEN_ESTIMATE
+        if estimated_tokens < CONTEXT_CACHE_MIN_TOKENS:
+            logger.info(f"{type(self).__name__} system prompt too short for context caching, sending inline")
+            return None
+        
+        try:
+            cache = self.client.caches.create(
+                model=self.model,
+                config={'system_instruction': self.system_prompt, 'ttl': f'{CONTEXT_CACHE_TTL_SECONDS}s'}
+            )
+            self._cache_expires_at = time.monotonic() + CONTEXT_CACHE_TTL_SECONDS
+            logger.info(f"{type(self).__name__} system prompt cached: {cache.name}")
+            return cache.name
+        except Exception as e:
+            logger.warning(f"Context caching unavailable, sending system prompt inline: {str(e)}")
+            return None
+    
+    def _generation_config(self) -> Dict:
+        """Reference the cached system prompt while it is live, otherwise send it inline"""
+        if self.cached_content and time.monotonic() < self._cache_expires_at:
+            config = {'cached_content': self.cached_content}
+        else:
+            config = {'system_instruction': self.system_prompt}
+        
+        if self.response_schema is not None:
+            config['response_mime_type'] = 'application/json'
+            config['response_schema'] = self.response_schema
+        return config
+    
+    def _generate_content(self, contents: str):
+        """Call Gemini on the sync transport with the dynamic contents"""
+        return self.client.models.generate_content(
+            model=self.model,
+            contents=contents,
+            config=self._generation_config()
+        )
+    
+    async def _agenerate_content(self, contents: str):
+        """Call Gemini with the dynamic contents without blocking the event loop"""
+        async with _gemini_semaphore():
+            return await self.client.aio.models.generate_content(
+                model=self.model,
+                contents=contents,
+                config=self._generation_config()
+            )
+    
+    async def _astream_content(self, contents: str) -> AsyncIterator[str]:
+        """Stream Gemini text chunks for the dynamic contents as they are produced"""
+        async with _gemini_semaphore():
+            stream = await self.client.aio.models.generate_content_stream(
+                model=self.model,
+                contents=contents,
+                config=self._generation_config()
+            )
+            async for chunk in stream:
+                if chunk.text:
+                    yield chunk.text
+
+class ProblemGeneratorAgent(GeminiAgent):
+    """Agent responsible for generating custom DSA problems"""
+    
+    system_prompt = PROBLEM_SYSTEM_PROMPT
+    response_schema = PROBLEM_SCHEMA
+    
+    def __init__(self, client):
+        super().__init__(client)
+        # (topic, difficulty, user_level) -> (content JSON, cached_at), kept in LRU order. Content is
+        # kept as text so every problem gets its own parsed copy that callers may freely mutate
+        self._cache: 'OrderedDict[Tuple[str, str, str], Tuple[str, float]]' = OrderedDict()
+        self._semantic_cache = SemanticCache()
+        # Disambiguates ids of problems built within the same second (e.g. cache hits)
+        self._id_sequence = itertools.count(1)
         logger.info("ProblemGeneratorAgent initialized")
     
+    @staticmethod
+    def _embedding_vector(response) -> Optional[np.ndarray]:
+        """Extract a usable embedding vector from an embed_content response"""
+        vector = np.asarray(response.embeddings[0].values, dtype=np.float32)
+        return vector if np.any(vector) else None
+    
+    def _embed(self, text: str) -> Optional[np.ndarray]:
+        """Embed text for semantic cache lookups, or None if embedding fails"""
+        try:
+            response = self.client.models.embed_content(model=EMBEDDING_MODEL, contents=text)
+            return self._embedding_vector(response)
+        except Exception as e:
+            logger.warning(f"Embedding failed, skipping semantic cache: {str(e)}")
+            return None
+    
+    async def _aembed(self, text: str) -> Optional[np.ndarray]:
+        """Embed text for semantic cache lookups without blocking, or None if embedding fails"""
+        try:
+            async with _gemini_semaphore():
+                response = await self.client.aio.models.embed_content(model=EMBEDDING_MODEL, contents=text)
+            return self._embedding_vector(response)
+        except Exception as e:
+            logger.warning(f"Embedding failed, skipping semantic cache: {str(e)}")
+            return None
+    
+    def _cache_get(self, key: Tuple[str, str, str]) -> Optional[str]:
+        """Return cached problem content JSON for key if present and not expired"""
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        
+        content, cached_at = entry
+        if time.monotonic() - cached_at > PROBLEM_CACHE_TTL_SECONDS:
+            del self._cache[key]
+            return None
+        
+        self._cache.move_to_end(key)
+        return content
+    
+    def _cache_put(self, key: Tuple[str, str, str], content: str):
+        """Store problem content JSON for key, evicting the least recently used entry when full"""
+        self._cache[key] = (content, time.monotonic())
+        self._cache.move_to_end(key)
+        if len(self._cache) > PROBLEM_CACHE_MAX_ENTRIES:
+            self._cache.popitem(last=False)
+    
+    def build_problem(self, topic: str, difficulty: str, content: Dict) -> Dict:
+        """Wrap problem content in a problem object with a fresh id and timestamp"""
+        now, generated_at = _cached_now()
+        topic_slug = topic.lower().replace(' ', '_')
+        return {
+            'id': f"{topic_slug}_{now.strftime('%Y%m%d%H%M%S')}_{next(self._id_sequence)}",
+            'topic': topic,
+            'difficulty': difficulty,
+            'content': content,
+            'generated_at': generated_at
+        }
+    
+    def _semantic_get(self, cache_key: Tuple[str, str, str], embedding: Optional[np.ndarray]) -> Optional[str]:
+        """Look up content for a similar topic, promoting a hit into the exact cache"""
+        if embedding is None:
+            return None
+        topic, difficulty, user_level = cache_key
+        content = self._semantic_cache.lookup(embedding, (difficulty, user_level), topic)
+        if content is not None:
+            self._cache_put(cache_key, content)
+        return content
+    
+    @staticmethod
+    def _semantic_candidate(topic: str) -> bool:
+        """Whether a topic may be served by a near-duplicate one from the semantic cache"""
+        # The standard topics are deliberately distinct, so a near match would be a different
+        # topic; skip the embedding round trip for them
+        return topic not in ALL_TOPICS
+    
+    def _lookup(self, cache_key: Tuple[str, str, str]) -> Tuple[Optional[str], Optional[np.ndarray]]:
+        """Check the exact then the semantic cache; return (cached content JSON, topic embedding)"""
+        content = self._cache_get(cache_key)
+        if content is not None or not self._semantic_candidate(cache_key[0]):
+            return content, None
+        
+        # Embed only the topic: difficulty and level must match exactly, not semantically
+        embedding = self._embed(cache_key[0])
+        return self._semantic_get(cache_key, embedding), embedding
+    
+    async def _alookup(self, cache_key: Tuple[str, str, str]) -> Tuple[Optional[str], Optional[np.ndarray]]:
+        """Async twin of _lookup"""
+        content = self._cache_get(cache_key)
+        if content is not None or not self._semantic_candidate(cache_key[0]):
+            return content, None
+        
+        embedding = await self._aembed(cache_key[0])
+        return self._semantic_get(cache_key, embedding), embedding
+    
+    def _remember(self, cache_key: Tuple[str, str, str], embedding: Optional[np.ndarray], content: str):
+        """Store freshly generated content JSON in the exact and semantic caches"""
+        self._cache_put(cache_key, content)
+        if embedding is not None:
+            topic, difficulty, user_level = cache_key
+            self._semantic_cache.add(embedding, (difficulty, user_level), topic, content)
+    
+    def _problem_from_cache(self, topic: str, difficulty: str, content: str) -> Dict:
+        """Build a problem object around a fresh copy of cached content"""
+        problem = self.build_problem(topic, difficulty, json.loads(content))
+        logger.info(f"Problem served from cache: {problem['id']}")
+        return problem
+    
+    def _problem_from_response(self, cache_key: Tuple[str, str, str], embedding: Optional[np.ndarray], response_text: str) -> Dict:
+        """Parse generated content, cache it and build the problem object"""
+        topic, difficulty, _ = cache_key
+        
+        # Parse response, caching the text only once it is known to be valid
+        problem_content = json.loads(response_text)
+        self._remember(cache_key, embedding, response_text)
+        
+        # Create problem object
+        problem = self.build_problem(topic, difficulty, problem_content)
+        
+        logger.info(f"Problem generated successfully: {problem['id']}")
+        return problem
+    
     def generate_problem(self, topic: str, difficulty: str, user_level: str) -> Dict:
         """Generate a custom DSA problem"""
         logger.info(f"Generating problem: {topic} - {difficulty} - Level: {user_level}")
         
-        prompt = f"""You are an expert DSA problem creator for technical interviews.
+        cache_key = (topic, difficulty, user_level)
+        prompt = _render_problem_prompt(topic, difficulty, user_level)
         
-        Create a {difficulty} level {topic} problem suitable for a {user_level} programmer preparing for technical interviews.
+        cached_content, embedding = self._lookup(cache_key)
+        if cached_content is not None:
+            return self._problem_from_cache(topic, difficulty, cached_content)
         
-        Provide:
-        1. Problem Title
-        2. Problem Description (clear and concise)
-        3. Input Format
-        4. Output Format
-        5. Constraints
-        6. Sample Test Cases (2-3 examples with explanations)
-        7. Hints (2-3 hints without giving away the solution)
+        try:
+            response = self._generate_content(prompt)
+            return self._problem_from_response(cache_key, embedding, response.text)
+            
+        except Exception as e:
+            logger.error(f"Error generating problem: {str(e)}")
+            return {'error': str(e)}
+    
+    async def agenerate_problem(self, topic: str, difficulty: str, user_level: str) -> Dict:
+        """Generate a custom DSA problem without blocking the event loop"""
+        logger.info(f"Generating problem: {topic} - {difficulty} - Level: {user_level}")
         
-        Format the response as JSON with keys: title, description, input_format, output_format, constraints, test_cases, hints
-        """
+        cache_key = (topic, difficulty, user_level)
+        prompt = _render_problem_prompt(topic, difficulty, user_level)
+        
+        cached_content, embedding = await self._alookup(cache_key)
+        if cached_content is not None:
+            return self._problem_from_cache(topic, difficulty, cached_content)
         
         try:
-            response = self.client.models.generate_content(
-                model=self.model,
-                contents=prompt
-            )
-            
-            # Parse response
-            problem_text = response.text
-            
-            # Create problem object
-            problem = {
-                'id': f"{topic.lower().replace(' ', '_')}_{datetime.now().strftime('%Y%m%d%H%M%S')}",
-                'topic': topic,
-                'difficulty': difficulty,
-                'content': problem_text,
-                'generated_at': datetime.now().isoformat()
-            }
-            
-            logger.info(f"Problem generated successfully: {problem['id']}")
-            return problem
+            response = await self._agenerate_content(prompt)
+            return self._problem_from_response(cache_key, embedding, response.text)
             
         except Exception as e:
             logger.error(f"Error generating problem: {str(e)}")
             return {'error': str(e)}
+    
+    async def astream_problem(self, topic: str, difficulty: str, user_level: str) -> AsyncIterator[Union[str, Dict]]:
+        """Stream a custom DSA problem's JSON content as Gemini generates it
+        
+        Yields str chunks of the content, then the parsed problem object as the final item.
+        """
+        logger.info(f"Streaming problem: {topic} - {difficulty} - Level: {user_level}")
+        
+        cache_key = (topic, difficulty, user_level)
+        prompt = _render_problem_prompt(topic, difficulty, user_level)
+        
+        cached_content, embedding = await self._alookup(cache_key)
+        if cached_content is not None:
+            yield cached_content
+            yield self._problem_from_cache(topic, difficulty, cached_content)
+            return
+        
+        chunks = []
+        stream = self._astream_content(prompt)
+        try:
+            async for chunk in stream:
+                chunks.append(chunk)
+                yield chunk
+        except Exception as e:
+            logger.error(f"Error streaming problem: {str(e)}")
+            raise
+        finally:
+            # Release the concurrency slot as soon as this stream is closed, not at garbage collection
+            await stream.aclose()
+        
+        yield self._problem_from_response(cache_key, embedding, ''.join(chunks))
 
-class SolutionEvaluatorAgent:
+class SolutionEvaluatorAgent(GeminiAgent):
     """Agent responsible for evaluating user solutions"""
     
+    system_prompt = EVALUATOR_SYSTEM_PROMPT
+    response_schema = EVALUATION_SCHEMA
+    
     def __init__(self, client):
-        self.client = client
-        self.model = 'gemini-2.0-flash-exp'
+        super().__init__(client)
         logger.info("SolutionEvaluatorAgent initialized")
     
+    @staticmethod
+    def _evaluation_prompt(problem: Dict, solution_code: str, language: str) -> str:
+        """Fill the evaluation request template for a problem and submitted solution"""
+        problem_content = problem.get('content', '')
+        if not isinstance(problem_content, str):
+            problem_content = json.dumps(problem_content, indent=2)
+        
+        return EVALUATION_PROMPT_TMPL.format_map({
+            'problem': problem_content,
+            'language': language,
+            'solution_code': solution_code
+        })
+    
+    @staticmethod
+    def _evaluation_from_response(problem: Dict, response_text: str) -> Dict:
+        """Parse Gemini's structured feedback into an evaluation object"""
+        evaluation = {
+            'problem_id': problem.get('id'),
+            'feedback': json.loads(response_text),
+            'evaluated_at': _iso_now()
+        }
+        
+        logger.info(f"Solution evaluated successfully")
+        return evaluation
+    
     def evaluate_solution(self, problem: Dict, solution_code: str, language: str) -> Dict:
         """Evaluate submitted solution"""
         logger.info(f"Evaluating solution for problem: {problem.get('id', 'unknown')}")
         
-        prompt = f"""You are an expert code reviewer for technical interviews.
-        
-        Problem:
-        {problem.get('content', '')}
+        prompt = self._evaluation_prompt(problem, solution_code, language)
         
-        Submitted Solution ({language}):
-        ```{language}
-        {solution_code}
-        ```
-        
-        Evaluate the solution and provide:
-        1. Correctness (Does it solve the problem?)
-        2. Time Complexity
-        3. Space Complexity
-        4. Code Quality (readability, style)
-        5. Edge Cases Handled
-        6. Suggestions for Improvement
-        7. Overall Score (0-100)
+        try:
+            response = self._generate_content(prompt)
+            return self._evaluation_from_response(problem, response.text)
+            
+        except Exception as e:
+            logger.error(f"Error evaluating solution: {str(e)}")
+            return {'error': str(e)}
+    
+    async def aevaluate_solution(self, problem: Dict, solution_code: str, language: str) -> Dict:
+        """Evaluate submitted solution without blocking the event loop"""
+        logger.info(f"Evaluating solution for problem: {problem.get('id', 'unknown')}")
         
-        Format as JSON with keys: correctness, time_complexity, space_complexity, code_quality, edge_cases, suggestions, score
-        """
+        prompt = self._evaluation_prompt(problem, solution_code, language)
         
         try:
-            response = self.client.models.generate_content(
-                model=self.model,
-                contents=prompt
-            )
-            
-            evaluation = {
-                'problem_id': problem.get('id'),
-                'feedback': response.text,
-                'evaluated_at': datetime.now().isoformat()
-            }
-            
-            logger.info(f"Solution evaluated successfully")
-            return evaluation
+            response = await self._agenerate_content(prompt)
+            return self._evaluation_from_response(problem, response.text)
             
         except Exception as e:
             logger.error(f"Error evaluating solution: {str(e)}")
             return {'error': str(e)}
+    
+    async def aevaluate_many(self, submissions: List[Dict], workers: int = 8) -> List[Dict]:
+        """Evaluate many submissions with a pool of workers pulling from a shared queue
+        
+        Each submission is a dict with 'problem', 'solution_code' and optional 'language'.
+        Results are returned in submission order; a slow evaluation only occupies one
+        worker while the others keep draining the queue.
+        """
+        logger.info(f"Evaluating {len(submissions)} submissions with {workers} workers")
+        
+        queue: asyncio.Queue = asyncio.Queue()
+        for index, submission in enumerate(submissions):
+            queue.put_nowait((index, submission))
+        results: List[Optional[Dict]] = [None] * len(submissions)
+        
+        async def worker():
+            while True:
+                index, submission = await queue.get()
+                try:
+                    results[index] = await self.aevaluate_solution(
+                        problem=submission['problem'],
+                        solution_code=submission['solution_code'],
+                        language=submission.get('language', 'python')
+                    )
+                except Exception as e:
+                    logger.error(f"Error evaluating submission {index}: {str(e)}")
+                    results[index] = {'error': str(e)}
+                finally:
+                    queue.task_done()
+        
+        tasks = [asyncio.create_task(worker()) for _ in range(max(1, min(workers, len(submissions))))]
+        try:
+            await queue.join()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        
+        return results
+    
+    def evaluate_many(self, submissions: List[Dict]) -> List[Dict]:
+        """Evaluate many submissions one at a time; use aevaluate_many for concurrency"""
+        logger.info(f"Evaluating {len(submissions)} submissions")
+        
+        return [
+            self.evaluate_solution(
+                problem=submission['problem'],
+                solution_code=submission['solution_code'],
+                language=submission.get('language', 'python')
+            )
+            for submission in submissions
+        ]
 
 class DSAInterviewPrepAgent:
     """Main coordinator agent - manages the multi-agent workflow"""
     
-    def __init__(self, api_key: str):
-        self.client = genai.Client(api_key=api_key)
+    def __init__(self, api_key: Optional[str] = None, client: Optional[genai.Client] = None):
+        # One client (and its connection pool) is shared by every sub-agent
+        self.client = client or _shared_client(api_key)
         
         # Initialize sub-agents
         self.problem_generator = ProblemGeneratorAgent(self.client)
         self.solution_evaluator = SolutionEvaluatorAgent(self.client)
         self.progress_tracker = ProgressTracker()
         
+        # Recent raw submissions, written alongside each evaluation
+        self.submissions: 'deque[Dict]' = deque(maxlen=RECENT_ATTEMPTS)
+        
+        # Recently generated problems by id, so submissions are evaluated against the real problem
+        self.problem_index: 'OrderedDict[str, Dict]' = OrderedDict()
+        
         logger.info("DSAInterviewPrepAgent initialized with all sub-agents")
     
+    async def astart_session(self, user_level: str = 'intermediate') -> Dict:
+        """Start a new practice session"""
+        logger.info(f"Starting new session for {user_level} user")
+        
+        # Get recommended topic
+        topic = self.progress_tracker.recommend_next_topic()
+        
+        # Generate problem
+        problem = await self.problem_generator.agenerate_problem(
+            topic=topic,
+            difficulty='Medium',
+            user_level=user_level
+        )
+        self._index_problem(problem)
+        
+        return {
+            'status': 'session_started',
+            'problem': problem,
+            'progress': self.progress_tracker.get_progress_summary()
+        }
+    
     def start_session(self, user_level: str = 'intermediate') -> Dict:
         """Start a new practice session"""
         logger.info(f"Starting new session for {user_level} user")
@@ -219,6 +861,7 @@ class DSAInterviewPrepAgent:
             difficulty='Medium',
             user_level=user_level
         )
+        self._index_problem(problem)
         
         return {
             'status': 'session_started',
@@ -226,28 +869,116 @@ class DSAInterviewPrepAgent:
             'progress': self.progress_tracker.get_progress_summary()
         }
     
+    async def astream_session(self, user_level: str = 'intermediate') -> AsyncIterator[Dict]:
+        """Start a new practice session, streaming the problem as it is generated
+        
+        Yields {'status': 'streaming', 'chunk': ...} events while the problem text arrives,
+        then a final result shaped like astart_session's. Call aclose() when
+        stopping early so the Gemini stream is released promptly.
+        """
+        logger.info(f"Starting new streamed session for {user_level} user")
+        
+        topic = self.progress_tracker.recommend_next_topic()
+        
+        problem = None
+        stream = self.problem_generator.astream_problem(
+            topic=topic,
+            difficulty='Medium',
+            user_level=user_level
+        )
+        try:
+            async for item in stream:
+                if isinstance(item, str):
+                    yield {'status': 'streaming', 'chunk': item}
+                else:
+                    problem = item
+            self._index_problem(problem)
+        except Exception as e:
+            problem = {'error': str(e)}
+        finally:
+            await stream.aclose()
+        
+        yield {
+            'status': 'session_started',
+            'problem': problem,
+            'progress': self.progress_tracker.get_progress_summary()
+        }
+    
+    async def astart_session_batch(self, n: int = 3, user_level: str = 'intermediate') -> Dict:
+        """Start a practice session with up to n problems on distinct topics, generated concurrently"""
+        logger.info(f"Starting batch session of {n} problems for {user_level} user")
+        
+        # Gemini concurrency is bounded inside the sub-agents, so fan out freely
+        topics = self.progress_tracker.recommend_next_topics(n)
+        results = await asyncio.gather(
+            *(self.problem_generator.agenerate_problem(topic=t, difficulty='Medium', user_level=user_level)
+              for t in topics),
+            return_exceptions=True
+        )
+        problems = [{'error': str(r)} if isinstance(r, Exception) else r for r in results]
+        for problem in problems:
+            self._index_problem(problem)
+        
+        return {
+            'status': 'session_started',
+            'problems': problems,
+            'progress': self.progress_tracker.get_progress_summary()
+        }
+    
+    def start_session_batch(self, n: int = 3, user_level: str = 'intermediate') -> Dict:
+        """Start a session with up to n problems on distinct topics, generated one at a time"""
+        logger.info(f"Starting batch session of {n} problems for {user_level} user")
+        
+        problems = [
+            self.problem_generator.generate_problem(topic=t, difficulty='Medium', user_level=user_level)
+            for t in self.progress_tracker.recommend_next_topics(n)
+        ]
+        for problem in problems:
+            self._index_problem(problem)
+        
+        return {
+            'status': 'session_started',
+            'problems': problems,
+            'progress': self.progress_tracker.get_progress_summary()
+        }
+    
+    async def asubmit_solution(self, problem_id: str, solution_code: str, language: str = 'python') -> Dict:
+        """Submit solution for evaluation"""
+        logger.info(f"Solution submitted for problem: {problem_id}")
+        
+        problem = self._find_problem(problem_id)
+        
+        # Evaluate solution while the submission itself is recorded
+        evaluation, _ = await asyncio.gather(
+            self.solution_evaluator.aevaluate_solution(
+                problem=problem,
+                solution_code=solution_code,
+                language=language
+            ),
+            self._persist_attempt(problem_id, solution_code, language)
+        )
+        
+        self._record_progress(problem, evaluation)
+        
+        return {
+            'status': 'solution_evaluated',
+            'evaluation': evaluation,
+            'progress': self.progress_tracker.get_progress_summary()
+        }
+    
     def submit_solution(self, problem_id: str, solution_code: str, language: str = 'python') -> Dict:
         """Submit solution for evaluation"""
         logger.info(f"Solution submitted for problem: {problem_id}")
         
-        # Find problem in history
-        problem = {'id': problem_id, 'content': 'Problem content placeholder'}
+        problem = self._find_problem(problem_id)
         
-        # Evaluate solution
         evaluation = self.solution_evaluator.evaluate_solution(
             problem=problem,
             solution_code=solution_code,
             language=language
         )
-        
-        # Update progress (mock - in real implementation, parse evaluation score)
-        solved = True  # Would be determined from evaluation
-        self.progress_tracker.update_progress(
-            problem_id=problem_id,
-            topic='Dynamic Programming',  # Would be from problem
-            difficulty='Medium',
-            solved=solved
-        )
+        self._record_submission(problem_id, solution_code, language)
+        self._record_progress(problem, evaluation)
         
         return {
             'status': 'solution_evaluated',
@@ -255,6 +986,49 @@ class DSAInterviewPrepAgent:
             'progress': self.progress_tracker.get_progress_summary()
         }
     
+    def _find_problem(self, problem_id: str) -> Dict:
+        """Look up a generated problem, falling back to an empty one for unknown ids"""
+        problem = self.problem_index.get(problem_id)
+        if problem is None:
+            logger.warning(f"Unknown problem id {problem_id}, evaluating without problem content")
+            problem = {'id': problem_id, 'content': ''}
+        return problem
+    
+    def _record_progress(self, problem: Dict, evaluation: Dict):
+        """Record an evaluated attempt under the problem's topic and difficulty"""
+        # Unknown problems and failed evaluations say nothing about the user's skill
+        if 'topic' not in problem or 'error' in evaluation:
+            return
+        
+        # Update progress (mock - in real implementation, parse evaluation score)
+        solved = True  # Would be determined from evaluation
+        self.progress_tracker.update_progress(
+            problem_id=problem['id'],
+            topic=problem['topic'],
+            difficulty=problem['difficulty'],
+            solved=solved
+        )
+    
+    def _index_problem(self, problem: Dict):
+        """Remember a generated problem so later submissions can look it up by id"""
+        if 'id' in problem:
+            self.problem_index[problem['id']] = problem
+            if len(self.problem_index) > RECENT_ATTEMPTS:
+                self.problem_index.popitem(last=False)
+    
+    async def _persist_attempt(self, problem_id: str, solution_code: str, language: str):
+        """Record a raw submission; async so a durable store can overlap with evaluation"""
+        self._record_submission(problem_id, solution_code, language)
+    
+    def _record_submission(self, problem_id: str, solution_code: str, language: str):
+        """Append a raw submission to the recent submission log"""
+        self.submissions.append({
+            'problem_id': problem_id,
+            'language': language,
+            'solution_code': solution_code,
+            'submitted_at': _iso_now()
+        })
+    
     def get_study_plan(self) -> Dict:
         """Get personalized study plan based on progress"""
         logger.info("Generating study plan")
@@ -265,6 +1039,7 @@ class DSAInterviewPrepAgent:
         return {
             'current_progress': progress,
             'recommended_topic': next_topic,
+            'topic_accuracy': self.progress_tracker.topic_accuracy(),
             'weak_areas': progress['weak_areas'],
             'suggestions': self._generate_study_suggestions(progress)
         }
@@ -284,6 +1059,12 @@ class DSAInterviewPrepAgent:
         
         return suggestions
 
+def _to_json(data: Any) -> str:
+    """Pretty-print data as JSON, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(data, indent=2)
+
 # Example usage
 if __name__ == "__main__":
     # Initialize the main agent
@@ -292,8 +1073,8 @@ if __name__ == "__main__":
     
     # Start a session
     session = agent.start_session(user_level='intermediate')
-    print(json.dumps(session, indent=2))
+    print(_to_json(session))
     
     # Get study plan
     study_plan = agent.get_study_plan()
-    print(json.dumps(study_plan, indent=2))
+    print(_to_json(study_plan))